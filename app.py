@@ -1,7 +1,7 @@
 # ================= IMPORTS =================
 from flask import (
     Flask, render_template, request, redirect,
-    session, url_for, jsonify, send_file
+    session, url_for, jsonify, send_file, send_from_directory
 )
 import mysql.connector
 from ml_model import forecast_price
@@ -9,10 +9,12 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+from PIL import Image
 from flask_mail import Mail, Message
-import csv, os
+import csv, json, mimetypes, os, uuid
 from datetime import datetime
 from authlib.integrations.flask_client import OAuth
+from build_assets import VENDOR_FILES
 
 # ================= PASSWORD RESET RATE LIMIT =================
 RESET_LIMIT = 3          # max attempts
@@ -54,9 +56,41 @@ ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+THUMB_PREFIX = "thumb_"
+THUMB_SIZE = (480, 360)
+
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_upload(image):
+    # A uuid rather than a timestamp: uploads are cached as immutable, so
+    # two uploads must never share a name
+    filename = secure_filename(image.filename)
+    stored_filename = f"{uuid.uuid4().hex}_{filename}"
+    image.save(os.path.join(app.config["UPLOAD_FOLDER"], stored_filename))
+    return stored_filename
+
+def make_thumbnail(image_filename):
+    # Always (re)written, so a thumbnail never outlives the image it shows
+    if not image_filename:
+        return None
+
+    thumb_filename = THUMB_PREFIX + image_filename
+    thumb_path = os.path.join(app.config["UPLOAD_FOLDER"], thumb_filename)
+
+    try:
+        with Image.open(os.path.join(app.config["UPLOAD_FOLDER"], image_filename)) as img:
+            img.thumbnail(THUMB_SIZE)
+            img.save(thumb_path)
+    except (OSError, Image.DecompressionBombError):
+        # Unreadable or oversized upload: the listing keeps the original
+        # only, and a half-written thumbnail must not be left behind
+        if os.path.exists(thumb_path):
+            os.remove(thumb_path)
+        return None
+
+    return thumb_filename
+
 # ================= DATABASE =================
 db = mysql.connector.connect(
     host="localhost",
@@ -66,6 +100,105 @@ db = mysql.connector.connect(
 )
 cursor = db.cursor(dictionary=True)
 
+# ================= LISTING READ MODEL =================
+# listing_view is a denormalized copy of property_listing carrying the
+# owner's name/email, the favorite count and the image variants, so every
+# listing page is served without joins or COUNT(*) over favorites.
+# The listing routes, toggle_favorite and profile keep it in step.
+#
+# It holds only the columns the app writes and the card/detail pages show;
+# list pages select the card subset below, the detail page the whole row.
+LISTING_CARD_COLUMNS = """
+    id, user_id, title, price, intent, status, image, image_thumb,
+    owner_name, favorite_count, created_at
+"""
+
+# Every listing_view row is produced by this statement, both by the full
+# fill and by sync_listing_view, so the two can't derive a column differently.
+# The only parameter is image_thumb.
+LISTING_VIEW_INSERT = """
+    INSERT INTO listing_view
+    (id,user_id,title,description,price,intent,status,image,image_thumb,
+     owner_name,owner_email,favorite_count,created_at)
+    SELECT p.id, p.user_id, p.title, p.description, p.price, p.intent,
+           p.status, p.image, %s, u.name, u.email,
+           (SELECT COUNT(*) FROM favorites f WHERE f.property_id = p.id),
+           p.created_at
+    FROM property_listing p
+    JOIN users u ON u.id = p.user_id
+"""
+
+def ensure_listing_view():
+    # Every worker imports the app at startup; the lock lets exactly one of
+    # them create and fill the table while the others wait for it
+    cursor.execute("SELECT GET_LOCK('livvra_listing_view', 60) AS locked")
+    cursor.fetchone()
+    try:
+        cursor.execute("SHOW TABLES LIKE 'listing_view'")
+        if cursor.fetchone():
+            return
+        create_listing_view()
+        fill_listing_view()
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('livvra_listing_view') AS released")
+        cursor.fetchone()
+
+def create_listing_view():
+    # CREATE TABLE ... SELECT takes every column type from property_listing
+    # and users themselves, so the copy cannot drift from the source schema
+    cursor.execute("""
+        CREATE TABLE listing_view (
+            favorite_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (id),
+            KEY idx_listing_view_user (user_id, created_at),
+            KEY idx_listing_view_status (status, created_at)
+        )
+        SELECT p.id, p.user_id, p.title, p.description, p.price, p.intent,
+               p.status, p.image, CONCAT(%s, p.image) AS image_thumb,
+               u.name AS owner_name, u.email AS owner_email, p.created_at
+        FROM property_listing p
+        JOIN users u ON u.id = p.user_id
+        WHERE 1=0
+    """, (THUMB_PREFIX,))
+
+def fill_listing_view(generate_thumbs=False):
+    cursor.execute("DELETE FROM listing_view")
+    cursor.execute(LISTING_VIEW_INSERT, (None,))
+
+    cursor.execute("SELECT id, image FROM listing_view WHERE image IS NOT NULL")
+    for row in cursor.fetchall():
+        image_thumb = THUMB_PREFIX + row["image"]
+        if not os.path.exists(os.path.join(app.config["UPLOAD_FOLDER"], image_thumb)):
+            # Generating thumbnails is slow, so startup leaves it to the CLI
+            image_thumb = make_thumbnail(row["image"]) if generate_thumbs else None
+        if image_thumb:
+            cursor.execute(
+                "UPDATE listing_view SET image_thumb=%s WHERE id=%s",
+                (image_thumb, row["id"])
+            )
+    db.commit()
+
+def sync_listing_view(pid, image_thumb):
+    # Upsert one row from the source tables, so the owner's name/email come
+    # from users rather than a possibly stale session, and a row missing
+    # from the read model is recreated
+    cursor.execute(LISTING_VIEW_INSERT + """
+        WHERE p.id=%s
+        ON DUPLICATE KEY UPDATE
+            title=VALUES(title), description=VALUES(description),
+            price=VALUES(price), intent=VALUES(intent), status=VALUES(status),
+            image=VALUES(image), image_thumb=VALUES(image_thumb),
+            owner_name=VALUES(owner_name), owner_email=VALUES(owner_email),
+            favorite_count=VALUES(favorite_count)
+    """, (image_thumb, pid))
+
+@app.cli.command("rebuild-listing-view")
+def rebuild_listing_view():
+    """Repair listing_view drift and create missing thumbnails."""
+    fill_listing_view(generate_thumbs=True)
+
+ensure_listing_view()
+
 # ================= RATE LIMIT CHECK =================
 def reset_rate_limited(email, ip):
     cursor.execute("""
@@ -83,6 +216,79 @@ BASE_DIR = os.getcwd()
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# ================= STATIC ASSETS =================
+# Built by build_assets.py: minified, content-hashed CSS/JS and vendored
+# libraries, each with precompressed .gz/.br variants next to it.
+ASSETS_DIR = os.path.join(BASE_DIR, "static", "dist")
+ASSETS_MANIFEST = os.path.join(ASSETS_DIR, "manifest.json")
+ASSET_MAX_AGE = 31536000  # one year
+IMMUTABLE_CACHE = f"public, max-age={ASSET_MAX_AGE}, immutable"
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+asset_manifest = {"mtime": None, "files": {}}
+
+def load_asset_manifest():
+    # Re-read only when build_assets.py has replaced the file, so a rebuild
+    # on a live host is picked up without a restart
+    try:
+        mtime = os.path.getmtime(ASSETS_MANIFEST)
+    except OSError:
+        return {}
+
+    if mtime != asset_manifest["mtime"]:
+        with open(ASSETS_MANIFEST, encoding="utf-8") as f:
+            asset_manifest["files"] = json.load(f)
+        asset_manifest["mtime"] = mtime
+
+    return asset_manifest["files"]
+
+@app.template_global()
+def asset_url(name):
+    hashed = load_asset_manifest().get(name)
+    if hashed:
+        return url_for("assets", filename=hashed)
+    # Assets not built (local development): vendored libraries come from
+    # their pinned CDN URL, our own files from static/src as-is
+    if name in VENDOR_FILES:
+        return VENDOR_FILES[name][0]
+    return url_for("static", filename=f"src/{name}")
+
+@app.route("/assets/<path:filename>")
+def assets(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    encoding, served = None, filename
+    for coding, ext in PRECOMPRESSED:
+        if request.accept_encodings[coding] and os.path.isfile(os.path.join(ASSETS_DIR, filename + ext)):
+            encoding, served = coding, filename + ext
+            break
+
+    # send_from_directory hands the open file to the server's
+    # wsgi.file_wrapper, which gunicorn/uWSGI turn into sendfile(2)
+    response = send_from_directory(
+        ASSETS_DIR, served, mimetype=mimetype, max_age=ASSET_MAX_AGE
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    response.vary.add("Accept-Encoding")
+    return response
+
+# ================= UPLOADED IMAGES =================
+@app.template_global()
+def upload_url(filename):
+    return url_for("uploads", filename=filename)
+
+@app.route("/uploads/<path:filename>")
+def uploads(filename):
+    # Upload names carry a uuid and are never rewritten in place
+    response = send_from_directory(
+        os.path.join(BASE_DIR, app.config["UPLOAD_FOLDER"]),
+        filename, max_age=ASSET_MAX_AGE
+    )
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    return response
+
 # ================= LOGIN =================
 @app.route("/", methods=["GET", "POST"])
 @app.route("/login", methods=["GET", "POST"])
@@ -207,7 +413,7 @@ def listings():
     min_price = request.args.get("min_price")
     max_price = request.args.get("max_price")
 
-    sql = "SELECT * FROM property_listing WHERE status='ACTIVE'"
+    sql = f"SELECT {LISTING_CARD_COLUMNS} FROM listing_view WHERE status='ACTIVE'"
     params = []
 
     if intent:
@@ -242,14 +448,23 @@ def favorites():
     uid = session["user"]["id"]
 
     cursor.execute("""
-        SELECT p.*
-        FROM property_listing p
-        JOIN favorites f ON f.property_id = p.id
-        WHERE f.user_id=%s
-        ORDER BY f.created_at DESC
+        SELECT property_id FROM favorites
+        WHERE user_id=%s
+        ORDER BY created_at DESC
     """, (uid,))
 
-    listings = cursor.fetchall()
+    ids = [r["property_id"] for r in cursor.fetchall()]
+    listings = []
+
+    if ids:
+        placeholders = ",".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT {LISTING_CARD_COLUMNS} FROM listing_view WHERE id IN ({placeholders})",
+            tuple(ids)
+        )
+        by_id = {r["id"]: r for r in cursor.fetchall()}
+        listings = [by_id[i] for i in ids if i in by_id]
+
     return render_template("listing.html", listings=listings)
 
 
@@ -271,6 +486,11 @@ def toggle_favorite(pid):
             DELETE FROM favorites
             WHERE user_id=%s AND property_id=%s
         """, (uid, pid))
+        cursor.execute("""
+            UPDATE listing_view
+            SET favorite_count = favorite_count - 1
+            WHERE id=%s
+        """, (pid,))
         db.commit()
         return jsonify({"status": "removed"})
     else:
@@ -278,6 +498,11 @@ def toggle_favorite(pid):
             INSERT INTO favorites (user_id, property_id, created_at)
             VALUES (%s,%s,NOW())
         """, (uid, pid))
+        cursor.execute("""
+            UPDATE listing_view
+            SET favorite_count = favorite_count + 1
+            WHERE id=%s
+        """, (pid,))
         db.commit()
         return jsonify({"status": "saved"})
 
@@ -305,8 +530,8 @@ def my_listings():
     if "user" not in session:
         return redirect("/login")
 
-    cursor.execute("""
-        SELECT * FROM property_listing
+    cursor.execute(f"""
+        SELECT {LISTING_CARD_COLUMNS} FROM listing_view
         WHERE user_id=%s
         ORDER BY created_at DESC
     """, (session["user"]["id"],))
@@ -318,10 +543,9 @@ def my_listings():
 @app.route("/property/<int:pid>")
 def property_details(pid):
     cursor.execute("""
-        SELECT p.*, u.name, u.email
-        FROM property_listing p
-        JOIN users u ON u.id = p.user_id
-        WHERE p.id=%s
+        SELECT *, owner_name AS name, owner_email AS email
+        FROM listing_view
+        WHERE id=%s
     """, (pid,))
     prop = cursor.fetchone()
 
@@ -346,9 +570,9 @@ def add_listing():
         image_filename = None
 
         if image and allowed_file(image.filename):
-            filename = secure_filename(image.filename)
-            image_filename = f"{int(datetime.now().timestamp())}_{filename}"
-            image.save(os.path.join(app.config["UPLOAD_FOLDER"], image_filename))
+            image_filename = save_upload(image)
+
+        image_thumb = make_thumbnail(image_filename)
 
         cursor.execute("""
             INSERT INTO property_listing
@@ -358,6 +582,7 @@ def add_listing():
             session["user"]["id"],
             title, description, price, intent, image_filename
         ))
+        sync_listing_view(cursor.lastrowid, image_thumb)
         db.commit()
 
         return redirect("/listings")
@@ -390,9 +615,12 @@ def edit_listing(pid):
         image_filename = listing["image"]
 
         if image and allowed_file(image.filename):
-            filename = secure_filename(image.filename)
-            image_filename = f"{int(datetime.now().timestamp())}_{filename}"
-            image.save(os.path.join(app.config["UPLOAD_FOLDER"], image_filename))
+            image_filename = save_upload(image)
+            image_thumb = make_thumbnail(image_filename)
+        else:
+            cursor.execute("SELECT image_thumb FROM listing_view WHERE id=%s", (pid,))
+            row = cursor.fetchone()
+            image_thumb = row["image_thumb"] if row else make_thumbnail(image_filename)
 
         cursor.execute("""
             UPDATE property_listing
@@ -402,6 +630,7 @@ def edit_listing(pid):
             title, description, price, intent,
             image_filename, pid, session["user"]["id"]
         ))
+        sync_listing_view(pid, image_thumb)
         db.commit()
 
         return redirect("/listings")
@@ -418,6 +647,10 @@ def delete_listing(pid):
         DELETE FROM property_listing
         WHERE id=%s AND user_id=%s
     """, (pid, session["user"]["id"]))
+    cursor.execute("""
+        DELETE FROM listing_view
+        WHERE id=%s AND user_id=%s
+    """, (pid, session["user"]["id"]))
     db.commit()
 
     return redirect("/listings")
@@ -571,6 +804,11 @@ def profile():
             SET name=%s, email=%s
             WHERE id=%s
         """, (name, email, session["user"]["id"]))
+        cursor.execute("""
+            UPDATE listing_view
+            SET owner_name=%s, owner_email=%s
+            WHERE user_id=%s
+        """, (name, email, session["user"]["id"]))
         db.commit()
 
         session["user"]["name"] = name
@@ -0,0 +1,231 @@
+# ================= IMPORTS =================
+import gzip, hashlib, json, os, posixpath, re, tempfile
+import urllib.request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip variants are always built
+    brotli = None
+
+# ================= PATHS =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, "static", "src")
+DIST_DIR = os.path.join(BASE_DIR, "static", "dist")
+MANIFEST_FILE = os.path.join(DIST_DIR, "manifest.json")
+
+# ================= VENDORED LIBRARIES =================
+CHARTJS_VERSION = "4.5.1"
+LEAFLET_VERSION = "1.9.4"
+
+CHARTJS_URL = f"https://cdn.jsdelivr.net/npm/chart.js@{CHARTJS_VERSION}/dist"
+LEAFLET_URL = f"https://unpkg.com/leaflet@{LEAFLET_VERSION}/dist"
+
+LEAFLET_DIR = f"vendor/leaflet-{LEAFLET_VERSION}"
+
+# name -> (url, expected sha256 of the published file)
+VENDOR_FILES = {
+    "vendor/chart.umd.js": (
+        f"{CHARTJS_URL}/chart.umd.js",
+        "ecc3cd1eeb8c34d2178e3f59fd63ec5a3d84358c11730af0b9958dc886d7652a",
+    ),
+    f"{LEAFLET_DIR}/leaflet.js": (
+        f"{LEAFLET_URL}/leaflet.js",
+        "db49d009c841f5ca34a888c96511ae936fd9f5533e90d8b2c4d57596f4e5641a",
+    ),
+    f"{LEAFLET_DIR}/leaflet.css": (
+        f"{LEAFLET_URL}/leaflet.css",
+        "a7837102824184820dfa198d1ebcd109ff6d0ff9a2672a074b9a1b4d147d04c6",
+    ),
+    f"{LEAFLET_DIR}/images/layers.png": (
+        f"{LEAFLET_URL}/images/layers.png",
+        "1dbbe9d028e292f36fcba8f8b3a28d5e8932754fc2215b9ac69e4cdecf5107c6",
+    ),
+    f"{LEAFLET_DIR}/images/layers-2x.png": (
+        f"{LEAFLET_URL}/images/layers-2x.png",
+        "066daca850d8ffbef007af00b06eac0015728dee279c51f3cb6c716df7c42edf",
+    ),
+    f"{LEAFLET_DIR}/images/marker-icon.png": (
+        f"{LEAFLET_URL}/images/marker-icon.png",
+        "574c3a5cca85f4114085b6841596d62f00d7c892c7b03f28cbfa301deb1dc437",
+    ),
+    f"{LEAFLET_DIR}/images/marker-icon-2x.png": (
+        f"{LEAFLET_URL}/images/marker-icon-2x.png",
+        "00179c4c1ee830d3a108412ae0d294f55776cfeb085c60129a39aa6fc4ae2528",
+    ),
+    f"{LEAFLET_DIR}/images/marker-shadow.png": (
+        f"{LEAFLET_URL}/images/marker-shadow.png",
+        "264f5c640339f042dd729062cfc04c17f8ea0f29882b538e3848ed8f10edb4da",
+    ),
+}
+
+# ================= BUILD CONFIG =================
+HASH_LENGTH = 10
+COMPRESSIBLE = (".css", ".js", ".svg", ".json")
+MIN_COMPRESS_SIZE = 512  # bytes; smaller files are not worth a variant
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def sha256_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def download(url):
+    """Download url to a temp file next to the vendor tree; return its path."""
+    # Same filesystem as static/src so os.replace is atomic, but outside it
+    # so a stray .part file is never picked up as a source asset.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(SRC_DIR), suffix=".part")
+    os.close(fd)
+    try:
+        urllib.request.urlretrieve(url, tmp)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.chmod(tmp, 0o644)
+    return tmp
+
+
+def fetch_vendor():
+    """Download the pinned third-party libraries into static/src/vendor.
+
+    Files already on disk are re-checked on every build, so a corrupted
+    copy is fetched again instead of being fingerprinted and cached.
+    """
+    for name, (url, expected) in VENDOR_FILES.items():
+        dest = os.path.join(SRC_DIR, name)
+        if os.path.exists(dest) and sha256_file(dest) == expected:
+            continue
+
+        print(f"fetch  {url}")
+        tmp = download(url)
+        actual = sha256_file(tmp)
+        if actual != expected:
+            os.remove(tmp)
+            raise SystemExit(f"{name}: sha256 {actual} does not match pinned {expected}")
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(tmp, dest)
+
+
+# ================= MINIFY =================
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    text = text.replace(";}", "}")
+    return text.strip()
+
+
+def minify_js(text):
+    # Conservative: drop indentation, blank lines and full-line block
+    # comments, but keep line breaks so automatic semicolon insertion
+    # behaves exactly as in the source.
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or (line.startswith("/*") and line.endswith("*/")):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def rewrite_css_urls(text, name, manifest):
+    """Point relative url() references at their fingerprinted files."""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base, ref))
+        if target not in manifest:
+            return match.group(0)
+        rel = posixpath.relpath(manifest[target], base or ".")
+        return f"url({quote}{rel}{quote})"
+
+    return CSS_URL_RE.sub(replace, text)
+
+
+# ================= BUILD =================
+def fingerprint(name, data):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    root, ext = posixpath.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)  # mkstemp creates 0600; the web server must read it
+    os.replace(tmp, path)
+
+
+def write_variants(path, data):
+    # Compressed variants first, so the app never sees a plain file whose
+    # .gz/.br sibling is still half written
+    if path.endswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_SIZE:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            write_atomic(path + ".gz", gz)
+
+        if brotli:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                write_atomic(path + ".br", br)
+
+    write_atomic(path, data)
+
+
+def source_files():
+    names = []
+    for root, _, files in os.walk(SRC_DIR):
+        for filename in files:
+            rel = os.path.relpath(os.path.join(root, filename), SRC_DIR)
+            names.append(rel.replace(os.sep, "/"))
+    # CSS goes last so the files it references are already fingerprinted
+    return sorted(names, key=lambda n: (n.endswith(".css"), n))
+
+
+def build():
+    # Earlier hashed files are kept: cached HTML may still point at them,
+    # and a running app keeps serving the old manifest until it reloads.
+    os.makedirs(DIST_DIR, exist_ok=True)
+
+    manifest = {}
+    for name in source_files():
+        with open(os.path.join(SRC_DIR, name), "rb") as f:
+            data = f.read()
+
+        vendored = name.startswith("vendor/")
+        if name.endswith(".css"):
+            text = rewrite_css_urls(data.decode("utf-8"), name, manifest)
+            data = (text if vendored else minify_css(text)).encode("utf-8")
+        elif name.endswith(".js") and not vendored:
+            data = minify_js(data.decode("utf-8")).encode("utf-8")
+
+        # Leaflet locates its default marker icons by stripping the literal
+        # "marker-icon.png" from the CSS url, so vendored images keep their
+        # names; the versioned vendor directory makes them safe to cache.
+        if vendored and not name.endswith((".css", ".js")):
+            hashed = name
+        else:
+            hashed = fingerprint(name, data)
+        dest = os.path.join(DIST_DIR, hashed)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        write_variants(dest, data)
+        manifest[name] = hashed
+        print(f"build  {name} -> {hashed}")
+
+    # Written last and atomically; the app reloads it when its mtime changes
+    write_atomic(MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    return manifest
+
+
+# ================= RUN =================
+if __name__ == "__main__":
+    fetch_vendor()
+    build()
@@ -0,0 +1,151 @@
+let map, marker, locationSelected = false;
+
+document.addEventListener("DOMContentLoaded", () => {
+    map = L.map("map").setView([22.5,79],5);
+    L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png").addTo(map);
+
+    map.on("click", e => {
+        locationSelected = true;
+        if(marker) map.removeLayer(marker);
+
+        marker = L.marker(e.latlng,{
+            icon:L.divIcon({
+                className:"glow-marker",
+                html:"📍",
+                iconSize:[24,24],
+                iconAnchor:[12,12]
+            })
+        }).addTo(map);
+
+        locationStatus.innerText="Location: Selected";
+        updateBtn();
+    });
+});
+
+function updateBtn(){
+    predictBtn.disabled = !(area.value && price.value && years.value && locationSelected);
+}
+
+const chart = new Chart(document.getElementById("chart"),{
+    type:"line",
+    data:{labels:[],datasets:[{data:[],borderWidth:2,tension:0.35}]},
+    options:{responsive:true,maintainAspectRatio:false}
+});
+
+async function runPrediction(){
+    if(predictBtn.disabled) return;
+
+    const payload = {
+        area: area.value,
+        price: price.value,
+        years: years.value,
+        age: age.value || 5,
+        scenario: scenario.value,
+        intent: "BUY",
+        lat: marker.getLatLng().lat,
+        lng: marker.getLatLng().lng
+    };
+
+    const res = await fetch("/api/predict",{
+        method:"POST",
+        headers:{"Content-Type":"application/json"},
+        body:JSON.stringify(payload)
+    });
+
+    const d = await res.json();
+
+    chart.data.labels = d.years.map(y=>y+" Yr");
+    chart.data.datasets[0].data = d.prices;
+    chart.update();
+
+    result.innerText = "₹ " + d.final_price + " ("+d.price_change+"%)";
+    confidenceInfo.innerText = "Confidence: " + Math.round(d.confidence*100) + "%";
+    recommendation.innerText = d.recommendation;
+
+    bestYear.innerText = d.best_year + " (₹ " + d.best_year_price + ")";
+    profitLoss.innerText = "₹ " + d.profit_loss;
+    riskScore.innerText = d.risk;
+
+    explanationBox.innerText = "Why " + d.recommendation + "? " + d.explanation;
+    explanationBox.style.display = "block";
+
+    /* 🔄 LIVE COUNTER UPDATE */
+    refreshDashboardCounters();
+}
+
+["area","price","years","age","scenario"].forEach(i=>{
+    document.getElementById(i).addEventListener("input",updateBtn);
+});
+predictBtn.onclick = runPrediction;
+
+/* ===== INITIAL COUNTER ANIMATION ===== */
+function animateCounters(){
+    document.querySelectorAll(".counter").forEach(counter=>{
+        const target=+counter.dataset.target;
+        let current=0;
+        const step=Math.max(target/80,1);
+
+        const tick=()=>{
+            current+=step;
+            if(current<target){
+                counter.innerText=counter.innerText.includes("₹")
+                    ? "₹"+Math.floor(current).toLocaleString()
+                    : Math.floor(current);
+                requestAnimationFrame(tick);
+            } else {
+                counter.innerText=counter.innerText.includes("₹")
+                    ? "₹"+target.toLocaleString()
+                    : target;
+            }
+        };
+        tick();
+    });
+}
+document.addEventListener("DOMContentLoaded",animateCounters);
+
+/* ===== LIVE DASHBOARD COUNTER UPDATE ===== */
+async function refreshDashboardCounters(){
+    const res = await fetch("/api/dashboard-stats");
+    const s = await res.json();
+
+    applyCounter(0,s.total);
+    applyCounter(1,Math.round(s.avg_profit),true);
+    applyCounter(2,s.buy);
+    applyCounter(3,s.hold);
+    applyCounter(4,s.sell);
+}
+
+function applyCounter(idx,newVal,isMoney=false){
+    const el=document.querySelectorAll(".counter")[idx];
+    const old=+el.dataset.target||0;
+    el.dataset.target=newVal;
+    animateDelta(el,old,newVal,isMoney);
+}
+
+function animateDelta(el,start,end,isMoney){
+    let val=start;
+    const step=Math.max(Math.abs(end-start)/30,1);
+
+    const tick=()=>{
+        val+=step*Math.sign(end-start);
+        if((end-val)*(end-start)>0){
+            el.innerText=isMoney
+                ?"₹"+Math.floor(val).toLocaleString()
+                :Math.floor(val);
+            requestAnimationFrame(tick);
+        } else {
+            el.innerText=isMoney?"₹"+end.toLocaleString():end;
+            showDelta(el,end-start);
+        }
+    };
+    tick();
+}
+
+function showDelta(el,d){
+    if(!d) return;
+    const b=document.createElement("span");
+    b.className="badge bg-primary ms-2";
+    b.innerText=(d>0?"+":"")+d;
+    el.appendChild(b);
+    setTimeout(()=>b.remove(),1500);
+}